@@ -1,6 +1,6 @@
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, deque
-from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple, Union
 
 from ppq.core import ppq_warning
 
@@ -320,27 +320,85 @@ class PatternMatchHelper:
                                             ---     ---     ---    ---    --
 
         """
+        return PatternMatchHelper.match_burte_force_multiple(
+            graph=graph, patterns=[pattern], exclusive=exclusive, max_candidates=max_candidates)[0]
+
+    @ staticmethod
+    def match_burte_force_multiple(
+        graph: BaseGraph, patterns: List[GraphPattern],
+        exclusive: bool, max_candidates: int = 1000000) -> List[List[List[Operation]]]:
+        """同时匹配多个模式子图，所有模式共享同一次图遍历
+
+        graph 中的每一个算子只会被遍历一次，用来筛选出所有模式中每一个节点的候选算子，
+        而后每一个模式分别在自己的候选算子上执行 match_burte_force 中的枚举匹配。
+
+        返回值与 patterns 一一对应，其中每一项与 match_burte_force 的返回值相同。
+        """
+        # collect candidates for all nodes of all patterns within a single graph traversal.
+        candidates = [[[] for _ in pattern.node_patterns] for pattern in patterns]
+        for operation in graph.operations.values():
+            for pattern, node_candidates in zip(patterns, candidates):
+                for idx, node_pattern in enumerate(pattern.node_patterns):
+                    if node_pattern(operation): node_candidates[idx].append(operation)
+
+        return [PatternMatchHelper._match_from_candidates(
+                    graph=graph, pattern=pattern, candidates=node_candidates,
+                    exclusive=exclusive, max_candidates=max_candidates)
+                for pattern, node_candidates in zip(patterns, candidates)]
+
+    @ staticmethod
+    def match_anchored(
+        graph: BaseGraph, pattern: GraphPattern, anchors: Iterable[Operation],
+        exclusive: bool, max_candidates: int = 1000000) -> List[List[Operation]]:
+        """从给定的锚点算子出发进行子图模式匹配，结果与 match_burte_force 相同（仅保留根节点位于锚点中的匹配）
+
+        模式根节点只在 anchors 中选取，其余节点只在已匹配上游节点的下游算子中选取，
+        而不再遍历整张图，对于由计算节点起始的定长模式(swish, mish)，
+        匹配复杂度由 O(NM) 降低为 O(KM)，其中 K 是锚点数量。
+        """
+        node_order = pattern.order
+        candidates = [None for _ in pattern.node_patterns]
+        candidates[node_order[0]] = [op for op in anchors if pattern.node_patterns[node_order[0]](op)]
+
+        # pattern with more than 1 root, other roots are still searched within the whole graph.
+        for idx in node_order[1: ]:
+            if len(pattern.input_table[idx]) == 0:
+                candidates[idx] = [op for op in graph.operations.values() if pattern.node_patterns[idx](op)]
+
+        return PatternMatchHelper._match_from_candidates(
+            graph=graph, pattern=pattern, candidates=candidates,
+            exclusive=exclusive, max_candidates=max_candidates, anchored=True)
+
+    @ staticmethod
+    def _match_from_candidates(
+        graph: BaseGraph, pattern: GraphPattern, candidates: List[List[Operation]],
+        exclusive: bool, max_candidates: int, anchored: bool = False) -> List[List[Operation]]:
 
         def is_linked(upstream_op: Operation, downstream_op: Operation) -> bool:
             if upstream_op is None or downstream_op is None: return True
             return downstream_op in graph.get_downstream_operations(upstream_op)
 
-        node_order = pattern.order
-        matched_patterns = []
+        node_order, root_candidates = pattern.order, candidates[pattern.order[0]]
+        if anchored: # anchored candidates are visited in graph order, same as a full graph traversal.
+            position = {id(op): pos for pos, op in enumerate(graph.operations.values())}
+            # anchors can be given in any order(or repeated), roots are deduplicated and sorted as well.
+            root_candidates = {id(op): op for op in root_candidates if id(op) in position}
+            root_candidates = sorted(root_candidates.values(), key=lambda op: position[id(op)])
 
         # match root from graph, further pattern matching will start from root.
-        for operation in graph.operations.values():
-            root_idx = node_order[0]
-            if pattern.node_patterns[root_idx](operation):
-                matched_patterns.append([operation] + [None for _ in range(len(node_order) - 1)])
+        matched_patterns = [[operation] + [None for _ in range(len(node_order) - 1)]
+                            for operation in root_candidates]
 
         for idx in node_order[1: ]:
-            node_candidates, next_generation = [], []
-            for operation in graph.operations.values():
-                if pattern.node_patterns[idx](operation):
-                    node_candidates.append(operation)
-
+            node_candidates, next_generation = candidates[idx], []
             for matched_pattern in matched_patterns:
+                if candidates[idx] is None:
+                    # anchored matching, only downstream operations of a matched upstream node can pass the link check.
+                    upstream_op = matched_pattern[next(iter(pattern.input_table[idx]))]
+                    linked = {id(op): op for op in graph.get_downstream_operations(upstream_op)
+                              if pattern.node_patterns[idx](op)}
+                    node_candidates = sorted(linked.values(), key=lambda op: position[id(op)])
+
                 for operation in node_candidates:
                     is_pattern_root = len(pattern.input_table[idx]) == 0
                     link_check, exclusive_check, duplicated_check = True, True, True
@@ -688,3 +746,28 @@ class SearchableGraph(GraphCommandProcessor):
         return PatternMatchHelper().match_burte_force(
             graph=self.graph, pattern=GraphPattern(node_patterns=patterns, edges=edges), 
             exclusive=exclusive)
+
+    def pattern_matching_from(self, anchors: Union[Callable, Iterable[Operation]],
+                              patterns: List[Callable], edges: List[List[int]],
+                              exclusive: bool = True) -> List[List[Operation]]:
+        """从锚点出发的子图模式匹配，参数 patterns, edges, exclusive 的含义与 pattern_matching 相同。
+
+        anchors 可以是一个算子集合，也可以是一个判断条件(例如 lambda x: x.is_computing_op)，
+        模式根节点只会在锚点中选取，其余节点只会在已匹配节点的下游中选取。
+        """
+        if not isinstance(anchors, Iterable) and isinstance(anchors, Callable):
+            anchors = [op for op in self.graph.operations.values() if anchors(op)]
+        return PatternMatchHelper().match_anchored(
+            graph=self.graph, pattern=GraphPattern(node_patterns=patterns, edges=edges),
+            anchors=anchors, exclusive=exclusive)
+
+    def multi_pattern_matching(self, patterns: List[Tuple[List[Callable], List[List[int]]]],
+                               exclusive: bool = True) -> List[List[List[Operation]]]:
+        """同时匹配多个模式子图，每一个模式由 (patterns, edges) 给出，含义与 pattern_matching 相同。
+
+        所有模式共享同一次图遍历，返回值与给定的模式一一对应，
+        其中每一项与 pattern_matching 的返回值相同。
+        """
+        return PatternMatchHelper().match_burte_force_multiple(
+            graph=self.graph, exclusive=exclusive, patterns=[
+                GraphPattern(node_patterns=node_patterns, edges=edges) for node_patterns, edges in patterns])
@@ -59,4 +59,4 @@ from ppq.scheduler import (AggresiveDispatcher, ConservativeDispatcher,
                            GraphDispatcher, PPLNNDispatcher)
 from ppq.scheduler.perseus import Perseus
 from ppq.utils.round import (ppq_numerical_round, ppq_round_to_power_of_2,
-                             ppq_tensor_round)
+                             ppq_tensor_round, ppq_tensor_round_to_power_of_2)
@@ -45,6 +45,9 @@ class BlockwiseReconstructionSetting():
         # 区块大小
         self.block_size         = 4
 
+        # 是否使用 bf16 混合精度训练（需要支持 bf16 的 GPU）
+        self.using_bf16         = False
+
 
 class SSDEqualizationSetting():
     def __init__(self) -> None:
@@ -52,7 +52,8 @@ from .data import (DataType, OperationMeta, TensorMeta, convert_any_to_numpy,
                    convert_any_to_torch_tensor, convert_primary_type_to_list)
 from .defs import (SingletonMeta, empty_ppq_cache, ppq_debug_function,
                    ppq_file_io, ppq_info, ppq_legacy,
-                   ppq_quant_param_computing_function, ppq_warning)
+                   ppq_quant_param_computing_function, ppq_torch_compile,
+                   ppq_warning)
 from .ffi import CUDA
 from .quant import (ChannelwiseTensorQuantizationConfig, NetworkFramework,
                     OperationQuantizationConfig, QuantizationPolicy,
@@ -0,0 +1,2 @@
+# PPQ 的版本号，此文件不导入任何模块，打包时由 pyproject.toml 静态读取
+__version__ = '0.6.7'
@@ -48,9 +48,9 @@ FORMATTER_REMOVE_ISOLATED = True
 
 # PASSIVE OPERATIONS 是那些不参与计算的 Op, 这些 op 的输入与输出将直接共享 scale
 # 同时这些 op 前后的定点过程将被直接停用
-PASSIVE_OPERATIONS = {
+PASSIVE_OPERATIONS = frozenset({
     'MaxPool', 'GlobalMaxPool', 'Reshape', 'Flatten', 'Identity', 'Dropout'
-    'Slice', 'Pad', 'Split', 'Transpose', 'Interp', 'Squeeze', 'Unsqueeze'}
+    'Slice', 'Pad', 'Split', 'Transpose', 'Interp', 'Squeeze', 'Unsqueeze'})
 # COPUTING OP 是所有计算层，该属性被用于联合定点和子图切分
 COMPUTING_OP = {'Conv', 'Gemm', 'ConvTranspose', 'MatMul', 'Attention', 'PPQBiasFusedMatMul'}
 # SOI OP 是所有产生 SOI 输出的节点类型，该属性被用于子图切分
@@ -58,9 +58,9 @@ SOI_OP = {'TopK', 'Shape', 'NonMaxSuppression'}
 
 # 强制联合定点的算子种类
 TYPES_FOR_ALIGNMENT = {
-    'Elementwise': {'Add', 'Sub', 'Sum'}, 
-    'Concat': {'Concat'}, 
-    'Pooling': {'AveragePool', 'GlobalAveragePool'}}
+    'Elementwise': frozenset({'Add', 'Sub', 'Sum'}),
+    'Concat': frozenset({'Concat'}),
+    'Pooling': frozenset({'AveragePool', 'GlobalAveragePool'})}
 # 强制联合定点手动覆盖
 ALIGNMENT_MANUL_OVERRIDE = 'ALIGNMENT_MANUL_OVERRIDE'
 
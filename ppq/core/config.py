@@ -1,13 +1,19 @@
+from ._version import __version__
+
+
 class PPQ_GLOBAL_CONFIGURATION:
     def __init__(self) -> None:
         # 是否启动 cuda kernel 加速计算
         self.USING_CUDA_KERNEL        = False
+
+        # 是否使用 torch.compile 融合训练过程中的逐元素算子（需要 torch >= 2.0）
+        self.USING_TORCH_COMPILE      = False
         
         # PPQ 的名字
         self.NAME                     = 'PPL Quantization Tool'
         
         # PPQ 的版本号
-        self.VERSION                  = '0.6.6'
+        self.VERSION                  = __version__
         
         # 导出图时是否导出权重（仅影响 Native 格式导出）
         self.DUMP_VALUE_WHEN_EXPORT   = True
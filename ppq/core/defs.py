@@ -5,6 +5,8 @@ You are not allowed to modify this 请勿修改此文件
 
 import gc
 from typing import Callable
+
+import torch
 from torch.cuda import empty_cache
 
 from .config import PPQ_CONFIG
@@ -85,6 +87,25 @@ def ppq_debug_function(func: Callable):
     return _wrapper
 
 
+def ppq_torch_compile(func: Callable):
+    """mark a function to be compiled by torch.compile.
+
+    Compilation only takes effect when PPQ_CONFIG.USING_TORCH_COMPILE = True
+        and torch.compile is available(torch >= 2.0), otherwise the function
+        runs eagerly. The compiled function is created lazily at its first call.
+    Args:
+        func (Callable): decorated function
+    """
+    compiled = None
+    def _wrapper(*args, **kwargs):
+        nonlocal compiled
+        if PPQ_CONFIG.USING_TORCH_COMPILE and hasattr(torch, 'compile'):
+            if compiled is None: compiled = torch.compile(func, dynamic=True)
+            return compiled(*args, **kwargs)
+        return func(*args, **kwargs)
+    return _wrapper
+
+
 def ppq_file_io(func: Callable):
     """mark a function to be a ppq file io function.
 
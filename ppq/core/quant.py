@@ -5,7 +5,8 @@ You are not allowed to modify this 请勿修改此文件
 
 import time  # for hash generation
 from enum import Enum
-from typing import Any, Iterable, List
+from functools import lru_cache
+from typing import Any, Iterable, List, Tuple
 
 import torch
 
@@ -358,6 +359,12 @@ class QuantizationStates(Enum):
                              QuantizationStates.DEQUANTIZED, QuantizationStates.DEACTIVED}
 
 
+@ lru_cache(maxsize=None)
+def channelwise_broadcast_shape(ndim: int, channel_axis: int) -> Tuple[int]:
+    """generate a shape that likes (1, 1, -1, 1), the only -1 is at channel axis."""
+    return tuple(1 if axis != channel_axis else -1 for axis in range(ndim))
+
+
 class TensorQuantizationConfig(Serializable):
     """
 ## TensorQuantizationConfig(Tensor 量化控制结构体)
@@ -637,6 +644,16 @@ TensorQuantizationConfig 是 PPQ 中的核心数据结构，它总是由 Quantiz
                 self.channel_axis == o.channel_axis and
                 self.rounding == o.rounding)
 
+    @ property
+    def scheme_signature(self) -> tuple:
+        """ A tuple of all fields compared by is_same_scheme.
+
+        Configs with equal signatures have a same scheme, comparing signatures is useful
+            when one config is compared with many others.
+        """
+        return (self.quant_max, self.quant_min, self.policy, self.num_of_bits,
+                self.exponent_bits, self.channel_axis, self.rounding)
+
     @ property
     def dominated_by(self):
         """dominated_by is a crucial feature for tensor quantization
@@ -684,6 +701,31 @@ TensorQuantizationConfig 是 PPQ 中的核心数据结构，它总是由 Quantiz
             root.state = QuantizationStates.OVERLAPPED
             self.state = QuantizationStates.OVERLAPPED
 
+    @ classmethod
+    def bulk_dominate(cls, master: 'TensorQuantizationConfig', slaves: Iterable['TensorQuantizationConfig']):
+        """Equivalent to slave.dominated_by = master for each slave in order.
+
+        Root of master is resolved only once, it never changes during the procedure
+            since every group is merged into it.
+        """
+        assert isinstance(master, TensorQuantizationConfig), (
+            'Can only set this attribute with another tensor config.')
+        dominator = master.dominated_by
+        for slave in slaves:
+            assert isinstance(slave, TensorQuantizationConfig), (
+                'Can only set this attribute with another tensor config.')
+            if slave._hash == master._hash:
+                raise ValueError('Error with TQC.dominated_by = o: o must not equal to TQC its self.')
+            if slave._hash == dominator._hash:
+                raise ValueError('Can not Assign Dominator like this, '
+                                 'Circular reference was detected. Son TQC can not dominate its Father.')
+            root = slave.dominated_by
+            if root._hash != dominator._hash:
+                root._dominator  = dominator
+                slave._dominator = dominator
+                root.state  = QuantizationStates.OVERLAPPED
+                slave.state = QuantizationStates.OVERLAPPED
+
     @ property
     def master_by(self):
         if self._dominator == self:
@@ -856,6 +898,29 @@ TensorQuantizationConfig 是 PPQ 中的核心数据结构，它总是由 Quantiz
                 'self.policy.has_property(QuantizationProperty.PER_CHANNEL) == False.')
         self._channel_axis = channel_axis
 
+    def broadcast_shape(self, ndim: int) -> Tuple[int]:
+        """ Get a shape that per-channel scale and offset of this TQC should be viewed as,
+        to broadcast with a ndim tensor. For Per-tensor Quantization, it returns None.
+
+        Shapes are cached by (ndim, channel_axis), they are shared across all TQCs.
+        """
+        if not self.policy.has_property(QuantizationProperty.PER_CHANNEL): return None
+        return channelwise_broadcast_shape(ndim, self.channel_axis)
+
+    def scale_broadcast(self, ndim: int) -> torch.Tensor:
+        """ Get Quantization Scale of this TQC, which is broadcastable with a ndim tensor.
+
+        Only the shape is cached, view of scale is created every time,
+            so that it always follows current scale and grad mode.
+        """
+        shape = self.broadcast_shape(ndim)
+        return self.scale if shape is None else self.scale.view(shape)
+
+    def offset_broadcast(self, ndim: int) -> torch.Tensor:
+        """ Get Quantization Offset of this TQC, which is broadcastable with a ndim tensor. """
+        shape = self.broadcast_shape(ndim)
+        return self.offset if shape is None else self.offset.view(shape)
+
     def copy(self):
         """Create a tensor config from this one, keep policy and state
         unchanged.
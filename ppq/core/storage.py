@@ -9,11 +9,27 @@ import numpy as np
 import torch
 
 from .config import PPQ_CONFIG
-from .data import DataType, convert_any_to_numpy, convert_any_to_torch_tensor
+from .data import DataType, convert_any_to_numpy
 from .defs import ppq_file_io, ppq_warning
 import pickle
 
 
+# dtype conversions used by ValueState, they are resolved once at import time.
+# other dtypes still go through DataType, which raises for unsupported types.
+_NUMERIC_TYPES = (
+    DataType.BOOL, DataType.UINT8, DataType.INT8, DataType.INT16, DataType.INT32,
+    DataType.INT64, DataType.FP16, DataType.FP32, DataType.FP64)
+TORCH_TO_NUMPY_DTYPE = {DataType.to_torch(dtype): DataType.to_numpy(dtype) for dtype in _NUMERIC_TYPES}
+NUMPY_TO_TORCH_DTYPE = {DataType.to_numpy(dtype): DataType.to_torch(dtype) for dtype in _NUMERIC_TYPES}
+
+# ValueState dumps numeric arrays as raw bytes since ppq 0.6.7, it marks them with RAW_VALUE_FORMAT,
+# and raw bytes always start with RAW_VALUE_HEADER. The header is a tiny pickle stream referring to a
+# missing global: ppq <= 0.6.6 unpickles every dumped value, it stops at the header with an error
+# naming the missing global, instead of an opaque unpickling error.
+RAW_VALUE_FORMAT = 'raw-v1'
+RAW_VALUE_HEADER = b'\x80\x02cppq.core.storage\nRAW_VALUE_DUMPED_BY_PPQ_0_6_7_OR_NEWER\n.'
+
+
 def is_file_exist(file: str):
     if os.path.exists(file):
         return os.path.isfile(file)
@@ -27,11 +43,17 @@ def open_txt_file_from_writing(file: str, mode: str, encoding: str='utf-8'):
 
 class Serializable():
     """An interface which means a class instance is binary serializable,
-    nothing funny."""
+    nothing funny.
+
+    Serializable declares no slot itself, so that subclass without __slots__
+        keeps its __dict__ and subclass with __slots__(ValueState) has none."""
+    __slots__ = ()
+
     def __init__(self) -> None:
         self._export_value = PPQ_CONFIG.DUMP_VALUE_WHEN_EXPORT
 
-    def __setstate__(self, state: dict):
+    @ staticmethod
+    def check_state(state: dict):
         if not isinstance(state, dict):
             raise TypeError(f'PPQ Data Load Failure. Can not load data from {type(state)}, '
                 'Your data might get damaged.')
@@ -41,6 +63,8 @@ class Serializable():
                 'You are loading an object created by PPQ with different version,'
                 ' it might cause some problems.')
 
+    def __setstate__(self, state: dict):
+        self.check_state(state)
         for key, value in state.items():
             self.__dict__[key] = value
             if isinstance(value, ValueState):
@@ -61,16 +85,24 @@ class Serializable():
 
 
 class ValueState(Serializable):
+    """Numeric values are dumped as raw bytes together with their dtype and shape,
+    values dumped by pickle(created by former ppq) can still be loaded,
+    they are identified by the absence of _format attribute.
+
+    ValueState is created for every tensor attribute when dumping, it uses __slots__ instead of __dict__."""
+    __slots__ = ('_value_type', '_dtype', '_shape', '_value', '_format')
+
     def __init__(self, value: Any) -> None:
         self._value_type = str(value.__class__.__name__)
         if isinstance(value, np.ndarray):
             self._dtype = value.dtype
             self._shape = value.shape
-            self._value = pickle.dumps(value)
+            self._value = self.dump_array(value, dtype=self._dtype)
         elif isinstance(value, torch.Tensor):
-            self._dtype = DataType.to_numpy(DataType.convert_from_torch(value.dtype))
+            self._dtype = TORCH_TO_NUMPY_DTYPE.get(value.dtype)
+            if self._dtype is None: self._dtype = DataType.to_numpy(DataType.convert_from_torch(value.dtype))
             self._shape = value.shape
-            self._value = pickle.dumps(convert_any_to_numpy(value))
+            self._value = self.dump_array(convert_any_to_numpy(value), dtype=self._dtype)
         elif isinstance(value, list) or isinstance(value, tuple):
             self._value = value
             self._dtype = None
@@ -82,26 +114,53 @@ class ValueState(Serializable):
         else:
             raise TypeError(f'PPQ Data Dump Failure, can not dump value type {type(value)}')
 
+    def __getstate__(self) -> dict:
+        state = {name: getattr(self, name) for name in ValueState.__slots__ if hasattr(self, name)}
+        state['__version__'] = PPQ_CONFIG.VERSION
+        return state
+
+    def __setstate__(self, state: dict):
+        self.check_state(state)
+        for name in ValueState.__slots__:
+            if name in state: setattr(self, name, state[name])
+        return self
+
+    def dump_array(self, value: np.ndarray, dtype: Any) -> bytes:
+        # arrays of python objects can not be dumped as raw bytes, they are pickled instead.
+        if np.dtype(dtype).hasobject:
+            self._format = None
+            return pickle.dumps(value)
+        # array is joined with header as a flatten uint8 view, so that its data is copied only once.
+        self._format = RAW_VALUE_FORMAT
+        return b''.join((RAW_VALUE_HEADER, np.ascontiguousarray(value, dtype=dtype).reshape(-1).view(np.uint8)))
+
+    def load_array(self) -> np.ndarray:
+        value_format = getattr(self, '_format', None)
+        if value_format == RAW_VALUE_FORMAT:
+            if not self._value.startswith(RAW_VALUE_HEADER):
+                raise ValueError('PPQ Data Load Failure, header of raw value is missing, your data might get damaged.')
+            # array created by frombuffer is a readonly view of dumped bytes, copy it so that it is writable.
+            return np.frombuffer(
+                self._value, dtype=self._dtype, offset=len(RAW_VALUE_HEADER)).reshape(self._shape).copy()
+        if value_format is not None:
+            raise ValueError(f'PPQ Data Load Failure, value is dumped with an unknown format ({value_format}), '
+                             'it is probably created by a newer version of PPQ.')
+        value = pickle.loads(self._value)
+        assert isinstance(value, np.ndarray)
+        return value.astype(self._dtype).reshape(self._shape)
+
     def unpack(self) -> Any:
         if self._value_type == str(None.__class__.__name__):
             return None
         elif self._value_type == str('ndarray'):
-            value = pickle.loads(self._value)
-            assert isinstance(value, np.ndarray)
-            value = value.astype(self._dtype)
-            value = value.reshape(self._shape)
-            return value
+            return self.load_array()
         elif self._value_type == str('Tensor'):
             if self._value is not None:
-                value = pickle.loads(self._value)
-                assert isinstance(value, np.ndarray)
-                value = value.astype(self._dtype)
-                if value is not None:
-                    value = value.reshape(self._shape)
-                value = convert_any_to_torch_tensor(
-                    value, device='cpu', 
-                    dtype=DataType.to_torch(DataType.convert_from_numpy(self._dtype)))
-                return value
+                # loaded array is already a private writable copy, tensor shares its memory without another copy.
+                value = torch.from_numpy(self.load_array())
+                dtype = NUMPY_TO_TORCH_DTYPE.get(self._dtype)
+                if dtype is None: dtype = DataType.to_torch(DataType.convert_from_numpy(self._dtype))
+                return value.to(dtype=dtype)
             else:
                 return torch.tensor([], device='cpu')
         elif self._value_type in {'list', 'tuple', 'dict'}:
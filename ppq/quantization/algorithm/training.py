@@ -410,7 +410,7 @@ class LSQDelegator(TorchQuantizeDelegator):
                 scale = scale * grad_scale + (scale - scale * grad_scale).detach()
 
             if config.policy.has_property(QuantizationProperty.PER_CHANNEL):
-                shape = [1 if axis != config.channel_axis else -1 for axis in range(tensor.ndim)]
+                shape = config.broadcast_shape(tensor.ndim)
                 scale = scale.view(shape)
                 offset = offset.view(shape)
 
@@ -476,7 +476,7 @@ class RoundTuningDelegator(TorchQuantizeDelegator):
                 scale = scale * grad_scale + (scale - scale * grad_scale).detach()
 
             if config.policy.has_property(QuantizationProperty.PER_CHANNEL):
-                shape = [1 if axis != config.channel_axis else -1 for axis in range(tensor.ndim)]
+                shape = config.broadcast_shape(tensor.ndim)
                 scale = scale.view(shape)
                 offset = offset.view(shape)
 
@@ -553,10 +553,7 @@ class RoundTruningDelegator(TorchQuantizeDelegator):
         self._param_backup = self.var.value.clone()
 
         with torch.no_grad():
-            scale, _ = config.scale, config.offset
-            if config.policy.has_property(QuantizationProperty.PER_CHANNEL):    
-                shape = [1 if axis != config.channel_axis else -1 for axis in range(self.var.value.ndim)]
-                scale = scale.view(shape)
+            scale = config.scale_broadcast(self.var.value.ndim)
 
             rounding = ((self.var.value / scale) - (self.var.value / scale).floor())
             self.var.value = (self.var.value / scale).floor() * scale
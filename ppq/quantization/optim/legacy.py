@@ -1,11 +1,16 @@
 # Legacy Optimization Passes
+import inspect
+import math
 from collections import defaultdict
-from typing import Callable, Dict, Iterable, List
+from typing import Callable, Dict, Iterable, List, Union
 
-import numpy as np
 import torch
 from tqdm import tqdm
 
+try: from contextlib import nullcontext
+except ImportError: # python 3.6, suppress() without exception types does nothing.
+    from contextlib import suppress as nullcontext
+
 from ppq.core import *
 from ppq.core import QuantizationStates
 from ppq.executor import BaseGraphExecutor, TorchExecutor
@@ -29,7 +34,36 @@ class TimeDecay:
 
     def __call__(self, t):
         rel_t = (t - self.start_decay) / (self.t_max - self.start_decay)
-        return self.end_b + 0.5 * (self.start_b - self.end_b) * (1 + np.cos(rel_t * np.pi))
+        return self.end_b + 0.5 * (self.start_b - self.end_b) * (1 + math.cos(rel_t * math.pi))
+
+
+def build_adam_optimizer(params: List[torch.Tensor], lr: float) -> torch.optim.Adam:
+    """Create an Adam optimizer with multi-tensor implementation whenever it is available.
+    fused Adam(torch >= 2.0) updates all cuda parameters within a single kernel, foreach
+    Adam(torch >= 1.12) launches O(1) kernels per step instead of O(#params)."""
+    options = inspect.signature(torch.optim.Adam.__init__).parameters
+    kwargs = {}
+    if len(params) > 0 and all(p.is_cuda for p in params):
+        if 'fused' in options: kwargs['fused'] = True
+        elif 'foreach' in options: kwargs['foreach'] = True
+    return torch.optim.Adam(params, lr=lr, **kwargs)
+
+
+def release_gradients(optimizer: torch.optim.Optimizer) -> None:
+    """Same as optimizer.zero_grad(set_to_none=True), which requires torch >= 1.7.
+    Gradients are released instead of being filled with zeros, saving one kernel per parameter."""
+    for group in optimizer.param_groups:
+        for param in group['params']: param.grad = None
+
+
+@ ppq_torch_compile
+def adaround_regularization(
+    r: torch.Tensor, zeta: float, gamma: float, alpha: float, beta: Union[float, torch.Tensor]) -> torch.Tensor:
+    """Rounding loss of Adaround, compiled into a single fused reduction kernel
+    when PPQ_CONFIG.USING_TORCH_COMPILE = True. beta is annealed every step, compiled
+    function takes it as a 0-d tensor so that the compiled graph will not be specialized on it."""
+    h = ((zeta - gamma) * torch.sigmoid(r) + gamma).clamp(0, 1)
+    return alpha * (1 - torch.pow((h - 0.5).abs() * 2, beta)).sum()
 
 
 class AdaroundRegTerm(torch.nn.Module):
@@ -51,6 +85,7 @@ class AdaroundRegTerm(torch.nn.Module):
         self.warm_ratio = warm_ratio
         self.temp_anneal = TimeDecay(self.max_iter, self.warm_ratio)
         super().__init__()
+        self.beta_buffer = None
 
     def rectified_sigmoid(self, r: torch.Tensor) -> torch.Tensor:
         return ((self.zeta - self.gamma) * torch.sigmoid(r) + self.gamma).clamp(0, 1)
@@ -59,11 +94,39 @@ class AdaroundRegTerm(torch.nn.Module):
         if iter < self.max_iter * self.warm_ratio:
             round_loss = 0
         else:
-            self.beta = self.temp_anneal(iter)
-            round_loss = self.alpha * (1 - torch.pow((self.rectified_sigmoid(r) - 0.5).abs() * 2, self.beta)).sum()
+            self.beta = beta = self.temp_anneal(iter)
+            if PPQ_CONFIG.USING_TORCH_COMPILE:
+                # beta tensor is created once and filled in-place, fill_ with a python scalar does not sync device.
+                if self.beta_buffer is None or self.beta_buffer.device != r.device or self.beta_buffer.dtype != r.dtype:
+                    self.beta_buffer = torch.zeros((), dtype=r.dtype, device=r.device)
+                beta = self.beta_buffer.fill_(self.beta)
+            round_loss = adaround_regularization(
+                r=r, zeta=self.zeta, gamma=self.gamma, alpha=self.alpha, beta=beta)
         return round_loss
 
 
+@ ppq_torch_compile
+def adaround_quantize(
+    tensor: torch.Tensor, rounding: torch.Tensor, scale: torch.Tensor, offset: torch.Tensor,
+    zeta: float, gamma: float, quant_min: int, quant_max: int) -> torch.Tensor:
+    """Quant-dequant a tensor with learnable rounding, all elementwise ops here
+    will be fused into one kernel when PPQ_CONFIG.USING_TORCH_COMPILE = True."""
+    rounding = ((zeta - gamma) * torch.sigmoid(rounding) + gamma).clamp(0, 1)
+    tensor = (tensor / scale).floor() + rounding
+    tensor = torch.clamp(tensor + offset, quant_min, quant_max)
+    return (tensor - offset) * scale
+
+
+@ ppq_torch_compile
+def adaround_initial_rounding(
+    value: torch.Tensor, scale: torch.Tensor, zeta: float, gamma: float) -> torch.Tensor:
+    """Inverse of rectified sigmoid, initialize rounding with the fractional part
+    of value / scale. All elementwise ops here are executed in-place."""
+    rounding = value / scale
+    rounding.sub_(rounding.floor())
+    return rounding.sub_(gamma).reciprocal_().mul_(zeta - gamma).sub_(1).log_().neg_()
+
+
 class AdaRoundDelegator(TorchQuantizeDelegator):
     def __init__(
         self, var: QuantableVariable,
@@ -82,54 +145,43 @@ class AdaRoundDelegator(TorchQuantizeDelegator):
         if self.config.state == QuantizationStates.PASSIVE:
             raise TypeError(f'Can not create adaround delegator with variable {var.name}, '
                             'Adaround delegator can not work with passive parameter.')
-        self.param_backup = None
-        if self.is_parameter:
-            self.param_backup = self.var.value.clone()
+        # withdraw rarely happens, backup is kept in system memory to save gpu memory.
+        # pinned buffer is allocated directly, so that value is copied to system memory only once.
+        value = self.var.value.detach()
+        self.param_backup = torch.empty_like(value, device='cpu', pin_memory=value.is_cuda)
+        self.param_backup.copy_(value)
 
     @ staticmethod
     def initiate_rounding(value: torch.Tensor, config: TensorQuantizationConfig, zeta: float, gamma: float) -> torch.Tensor:
         with torch.no_grad():
-            scale, offset = config.scale, config.offset
-            if config.policy.has_property(QuantizationProperty.PER_CHANNEL):
-                shape = [1 if axis != config.channel_axis else -1 for axis in range(value.ndim)]
-                scale = scale.view(shape)
-
-            rounding = (value / scale) - (value / scale).floor()
-            rounding = - torch.log((zeta - gamma) / (rounding - gamma) - 1)
-            rounding = torch.zeros_like(rounding).copy_(rounding)
-            rounding.requires_grad = True
+            rounding = adaround_initial_rounding(
+                value=value, scale=config.scale_broadcast(value.ndim), zeta=zeta, gamma=gamma)
+        rounding.requires_grad_(True)
         return rounding
 
     def trainable_tensors(self) -> List[torch.Tensor]:
         tensors = [self.rounding]
         return tensors
 
+    @ torch.no_grad()
     def finalize(self) -> None:
-        weight, scale, offset = self.var.value, self.config.scale, self.config.offset
-        if self.config.policy.has_property(QuantizationProperty.PER_CHANNEL):
-            shape = [1 if axis != self.config.channel_axis else -1 for axis in range(weight.ndim)]
-            scale = scale.view(shape)
-            offset = offset.view(shape)
-        weight = (weight / scale).floor() + (self.rounding >= 0).float()
+        weight = self.var.value
+        scale, offset = self.config.scale_broadcast(weight.ndim), self.config.offset_broadcast(weight.ndim)
+        weight = (weight / scale).floor_().add_((self.rounding >= 0).to(weight.dtype))
         weight = torch.clamp(weight + offset, self.config.quant_min, self.config.quant_max)
         weight = (weight - offset) * scale
         self.var.value = weight
     
     def withdraw(self) -> None:
         with torch.no_grad():
-            self.var.value.copy_(self.param_backup)
+            self.var.value.copy_(self.param_backup, non_blocking=True)
 
     def __call__(self, tensor: torch.Tensor, config: TensorQuantizationConfig) -> torch.Tensor:
-        scale = config.scale
-        offset = config.offset
-        if config.policy.has_property(QuantizationProperty.PER_CHANNEL):
-            shape = [1 if axis != config.channel_axis else -1 for axis in range(tensor.ndim)]
-            scale = scale.view(shape)
-            offset = offset.view(shape)
-        tensor = (tensor / scale).floor() + self.reg.rectified_sigmoid(self.rounding)
-        tensor = torch.clamp(tensor + offset, config.quant_min, config.quant_max)
-        tensor = (tensor - offset) * scale
-        return tensor
+        return adaround_quantize(
+            tensor=tensor, rounding=self.rounding,
+            scale=config.scale_broadcast(tensor.ndim), offset=config.offset_broadcast(tensor.ndim),
+            zeta=self.reg.zeta, gamma=self.reg.gamma,
+            quant_min=config.quant_min, quant_max=config.quant_max)
 
     def regularization_loss(self, step: int) -> torch.Tensor:
         return self.reg.forward(r=self.rounding, iter=step)
@@ -155,11 +207,15 @@ class AdaroundPass(TrainingBasedPass):
     where y is the output of the current block running in fp32 mode, and y^ is the output of the current block running
     in quant mode, lambda is a hyperparameter adjusting scales of rounding loss, and v is the element-wise rounding
     parameter applied to weights of every computing op in the block.
+
+    Set using_bf16 = True to run forward of the block with bf16 autocast, rounding parameters and
+    quantization scales are kept in fp32. It requires a gpu with bf16 support(Ampere or newer).
     """
     def __init__(self, name: str = 'Block-wise Adaround Reconstruction',
         interested_layers: List[str] = [], is_scale_trainable: bool = False,
         steps: int = 8000, lr: float = 1e-3, gamma: float = 1.0,
-        collecting_device: str ='cuda', block_size: int = 4
+        collecting_device: str ='cuda', block_size: int = 4,
+        using_bf16: bool = False
     ) -> None:
         super().__init__(name = name)
         self.interested_layers  = interested_layers
@@ -169,6 +225,7 @@ class AdaroundPass(TrainingBasedPass):
         self.block_size         = block_size
         self.collecting_device  = collecting_device
         self.is_scale_trainable = is_scale_trainable
+        self.using_bf16         = using_bf16
         self.loss_fn            = torch_mean_square_error
 
 
@@ -179,25 +236,39 @@ class AdaroundPass(TrainingBasedPass):
         # minimizing MSE(W, W^), 900 epochs would be enough in this non-overfit setting. Note
         # that this is usually unnecessary in 8 bit quantization, but we do it it anyway and
         # the loss checking procedure makes sure we always obtain no worse results.
+        # weight scales of all computing ops are optimized together with one optimizer, losses of
+        # different ops are independent, so this is equivalent to optimizing them one by one.
+        delegators, params = [], []
         for op in block.rps:
             if op.is_computing_op and isinstance(op, QuantableOperation):
                 c, v = op.input_quant_config[1], op.inputs[1]
                 delegator = LSQDelegator(config=c, var=v, is_parameter_trainable=False)
-                params = delegator.trainable_tensors()
-                if len(params) == 0: continue
-
-                optimizer = torch.optim.Adam(params, lr=self.lr)
-                scheduler = torch.optim.lr_scheduler.MultiStepLR(optimizer, [int(steps / 2), int(steps * 2 / 3)])
-
-                initial_loss = loss_fn(delegator(tensor=v.value, config=c), v.value)
-                for _ in range(steps):
-                    optimizer.zero_grad()
-                    loss = loss_fn(delegator(tensor=v.value, config=c), v.value)
-                    loss.backward()
-                    optimizer.step()
-                    scheduler.step()
-                post_loss = loss_fn(delegator(tensor=v.value, config=c), v.value)
+                if len(delegator.trainable_tensors()) == 0: continue
+
+                # skip weight which is already well quantized.
+                with torch.no_grad():
+                    initial_loss = loss_fn(delegator(tensor=v.value, config=c), v.value)
+                if initial_loss < 1e-8: continue
+
+                delegators.append((delegator, c, v, initial_loss))
+                for param in delegator.trainable_tensors():
+                    if all([param is not p for p in params]): params.append(param)
+        if len(delegators) == 0: return
 
+        optimizer = build_adam_optimizer(params, lr=self.lr)
+        scheduler = torch.optim.lr_scheduler.MultiStepLR(optimizer, [int(steps / 2), int(steps * 2 / 3)])
+
+        for _ in range(steps):
+            release_gradients(optimizer)
+            loss = torch.stack([loss_fn(delegator(tensor=v.value, config=c), v.value)
+                                for delegator, c, v, _ in delegators]).sum()
+            loss.backward()
+            optimizer.step()
+            scheduler.step()
+
+        with torch.no_grad():
+            for delegator, c, v, initial_loss in delegators:
+                post_loss = loss_fn(delegator(tensor=v.value, config=c), v.value)
                 if post_loss > initial_loss:
                     delegator.withdraw()
 
@@ -243,40 +314,103 @@ class AdaroundPass(TrainingBasedPass):
                 executor.remove_quantize_delegate(config=cfg)
             return 0, 0
 
+        # bf16 autocast takes effect on computing ops(conv, gemm, etc.), their outputs are bf16 tensors.
+        # rounding parameters, quantization scales and rounding loss are still kept in fp32.
+        using_bf16 = self.using_bf16 and executor._device != 'cpu' and torch.cuda.is_available()
+        if using_bf16 and not hasattr(torch, 'autocast'):
+            ppq_warning('bf16 autocast requires torch >= 1.10, Adaround will be trained with fp32.')
+            using_bf16 = False
+        if using_bf16 and not torch.cuda.is_bf16_supported():
+            ppq_warning('Current device does not support bf16, Adaround will be trained with fp32.')
+            using_bf16 = False
+
         # initilize optimizer.
         if optimizer is None:
-            optimizer = torch.optim.Adam(tensors, lr=learning_rate)
+            optimizer = build_adam_optimizer(tensors, lr=learning_rate)
 
         dataset_length = len(qt_inputs)
         if dataset_length == 0: raise ValueError('Dataset is empty.')
 
-        # step 2 - training procedure
-        for idx in tqdm(range(steps), desc='# Tuning Procedure '):
-            qt_input, fp_output = qt_inputs[idx % dataset_length], fp_outputs[idx % dataset_length]
-
+        # move the whole dataset to executor device once if it fits in half of free gpu memory.
+        # otherwise data cached in system memory is copied to executor device with a side stream,
+        # copy of next batch overlaps with computation of current batch.
+        prefetch_stream = None
+        if self.collecting_device == 'cpu' and executor._device != 'cpu' and torch.cuda.is_available():
+            dataset_size = sum([value.numel() * value.element_size()
+                                for data in qt_inputs + fp_outputs for value in data.values()])
+            # torch.cuda.mem_get_info requires torch >= 1.11, dataset is prefetched batch by batch without it.
+            free_memory = torch.cuda.mem_get_info(executor._device)[0] if hasattr(torch.cuda, 'mem_get_info') else 0
+            if dataset_size < free_memory * 0.5:
+                qt_inputs  = [{k: v.to(executor._device) for k, v in data.items()} for data in qt_inputs]
+                fp_outputs = [{k: v.to(executor._device) for k, v in data.items()} for data in fp_outputs]
+            else:
+                # dataset is pinned only once, asynchronous copy requires page-locked memory.
+                prefetch_stream = torch.cuda.Stream()
+                qt_inputs  = [{k: v if v.is_pinned() else v.pin_memory() for k, v in data.items()} for data in qt_inputs]
+                fp_outputs = [{k: v if v.is_pinned() else v.pin_memory() for k, v in data.items()} for data in fp_outputs]
+
+        def fetch(step: int) -> Tuple[Dict[str, torch.Tensor], Dict[str, torch.Tensor]]:
+            qt_input, fp_output = qt_inputs[step % dataset_length], fp_outputs[step % dataset_length]
+            if prefetch_stream is None:
+                feed_dict = {k: v.to(executor._device) for k, v in qt_input.items()}
+                fp_output = {k: v.to(executor._device) for k, v in fp_output.items()}
+                return feed_dict, fp_output
+
+            with torch.cuda.stream(prefetch_stream):
+                feed_dict = {k: v.to(executor._device, non_blocking=True) for k, v in qt_input.items()}
+                fp_output = {k: v.to(executor._device, non_blocking=True) for k, v in fp_output.items()}
+            return feed_dict, fp_output
+
+        # rounding losses of all delegators share a same reg term(hyper parameters and annealing schedule).
+        ada_delegators = [delegator for delegator in delegators.values() if isinstance(delegator, AdaRoundDelegator)]
+        reg = AdaroundRegTerm(max_iter=steps)
+
+        def train_step(
+            feed_dict: Dict[str, torch.Tensor], fp_output: Dict[str, torch.Tensor],
+            step: int) -> None:
             # forward
-            optimizer.zero_grad()
-            feed_dict = {k: v.to(executor._device) for k, v in qt_input.items()}
-            output_names = [name for name in fp_output]
+            release_gradients(optimizer)
 
-            qt_output = executor.partial_graph_forward(
-                operations=block.rps, feed_dict=feed_dict, 
-                output_names=output_names)
+            # torch.autocast is only touched when bf16 is enabled, it does not exist in torch < 1.10.
+            with torch.autocast(device_type='cuda', dtype=torch.bfloat16) if using_bf16 else nullcontext():
+                qt_output = executor.partial_graph_forward(
+                    operations=block.rps, feed_dict=feed_dict,
+                    output_names=output_names)
 
             # compute loss
-            loss = 0.0
-            for idx, name in enumerate(output_names):
-                loss += self.loss_fn(qt_output[idx], fp_output[name].to(executor._device))
-            
-            # collect reg terms
-            for delegator in delegators.values():
-                if isinstance(delegator, AdaRoundDelegator):
-                    loss += delegator.regularization_loss(idx) * self.gamma
+            losses = [self.loss_fn(output, fp_output[name])
+                      for output, name in zip(qt_output, output_names)]
+
+            # collect reg terms, reg term is not a tensor during warm up.
+            # all delegators share a same reg term, their roundings are concatenated and reduced at once.
+            if len(ada_delegators) > 0:
+                roundings = torch.cat([delegator.rounding.flatten() for delegator in ada_delegators])
+                reg_loss = reg(r=roundings, iter=step)
+                if isinstance(reg_loss, torch.Tensor): losses.append(reg_loss * self.gamma)
 
             # backward from loss
-            assert isinstance(loss, torch.Tensor)
+            loss = torch.stack(losses).sum()
             loss.backward()
             optimizer.step()
+
+        # all batches share a same output schema. without prefetching, data is already
+        # on executor device and all batches can be built only once.
+        output_names = [name for name in fp_outputs[0]]
+        if prefetch_stream is None: batches = [fetch(idx) for idx in range(dataset_length)]
+        else: batch = fetch(0)
+
+        # step 2 - training procedure
+        for step in tqdm(range(steps), desc='# Tuning Procedure '):
+            if prefetch_stream is None: feed_dict, fp_output = batches[step % dataset_length]
+            else:
+                feed_dict, fp_output = batch
+                torch.cuda.current_stream().wait_stream(prefetch_stream)
+                for tensor in list(feed_dict.values()) + list(fp_output.values()):
+                    tensor.record_stream(torch.cuda.current_stream())
+                # nothing to prefetch after the last step.
+                if step + 1 < steps: batch = fetch(step + 1)
+
+            train_step(feed_dict=feed_dict, fp_output=fp_output, step=step)
             if scheduler is not None: scheduler.step()
 
         # step - 3: record post training loss
@@ -293,8 +427,14 @@ class AdaroundPass(TrainingBasedPass):
         # disable gradient for evaluation.
         self.disable_block_gradient(block)
 
-        # clear cache
-        torch.cuda.empty_cache()
+        # release training states(optimizer states, device copies of dataset),
+        # so that caching allocator can reuse their memory for next block.
+        optimizer = qt_inputs = fp_outputs = batches = batch = None
+        delegators.clear(); ada_delegators.clear()
+
+        # empty_cache is expensive, invoke it only when allocator holds a lot of unused memory.
+        if torch.cuda.is_available() and torch.cuda.memory_reserved() - torch.cuda.memory_allocated() > (2 << 30):
+            torch.cuda.empty_cache()
         return pre_loss, post_loss
 
 
@@ -1,4 +1,4 @@
-from typing import Iterable, List, Set
+from typing import Callable, Dict, Iterable, List, Set
 
 import torch
 from ppq.core import (ALIGNMENT_MANUL_OVERRIDE, TYPES_FOR_ALIGNMENT, PASSIVE_OPERATIONS,
@@ -6,13 +6,45 @@ from ppq.core import (ALIGNMENT_MANUL_OVERRIDE, TYPES_FOR_ALIGNMENT, PASSIVE_OPE
                       TargetPlatform, TensorQuantizationConfig,
                       empty_ppq_cache, ppq_warning)
 from ppq.executor import BaseGraphExecutor
-from ppq.IR import BaseGraph, Operation, QuantableOperation, Variable
+from ppq.IR import BaseGraph, Operation, QuantableOperation
 from ppq.IR.quantize import QuantableVariable
 from ppq.IR.search import SearchableGraph
 from ppq.quantization.observer.range import minmax_to_scale_offset
 
 from .base import QuantizationOptimizationPass
 
+_RELU_CLIP_TYPES = frozenset({'Relu', 'Clip'})
+
+# configs to be dominated by the output config of the last operation in swish(computing, sigmoid, mul)
+# and mish(computing, softplus, tanh, mul) pattern, each link is (operation index, is output, config index).
+_SWISH_LINKS = ((0, True, 0), (1, False, 0), (1, True, 0), (2, False, 0), (2, False, 1))
+_MISH_LINKS  = ((0, True, 0), (2, False, 0), (2, True, 0), (1, False, 0), (1, True, 0), (3, False, 0), (3, False, 1))
+
+
+def _fuse_activation_patterns(patterns: List[List[Operation]], links: Iterable[tuple], activation: str):
+    """Merge quantization configs of matched swish or mish patterns,
+    shared by QuantizeFusionPass, SwishFusionPass and MishFusionPass.
+
+    Patterns are validated and collected first, configs are merged afterwards in one batch."""
+    updates = []
+    for pattern in patterns:
+        platform = pattern[0].platform
+        if not all(isinstance(op, QuantableOperation) and op.platform == platform for op in pattern):
+            ppq_warning(f'There is a pattern of {activation} activation in your network start from {pattern[0]}, '
+                        f'however part of your {activation} activation is not quantable, '
+                        'so that graph fusion can not merge their quantization configuration.')
+            continue
+
+        # config property and config lists of each operation are resolved only once.
+        configs = [(config.input_quantization_config, config.output_quantization_config)
+                   for config in [op.config for op in pattern]]
+        updates.append((configs[-1][1][0], [
+            configs[op_idx][is_output][config_idx] for op_idx, is_output, config_idx in links]))
+
+    # dominated_by rewrites the union-find structure of configs, it is not thread safe.
+    for master_config, slave_configs in updates:
+        TensorQuantizationConfig.bulk_dominate(master_config, slave_configs)
+
 
 class QuantizeSimplifyPass(QuantizationOptimizationPass):
     """
@@ -67,24 +99,35 @@ class QuantizeSimplifyPass(QuantizationOptimizationPass):
         executor: BaseGraphExecutor,
         **kwargs
     ) -> None:
-        for _, variable in graph.variables.items():
-            assert isinstance(variable, Variable)
-            source_op = variable.source_op
+        # output configs of all quantable operations, indexed by variable name.
+        # it replaces source_op.outputs.index(variable), which is a linear scan for every variable.
+        # type of each operation is checked only once here, loop below tests membership with id.
+        source_configs, quantable_ops = {}, set()
+        for operation in graph.operations.values():
+            if not isinstance(operation, QuantableOperation): continue
+            quantable_ops.add(id(operation))
+            for var, config in zip(operation.outputs, operation.config.output_quantization_config):
+                source_configs[var.name] = config
 
-            if source_op is None: continue # input variables in network, they do not have a source
-            if not isinstance(source_op, QuantableOperation): continue
-            source_config = source_op.config.output_quantization_config[source_op.outputs.index(variable)]
+        FP32, INITIAL = QuantizationStates.FP32, QuantizationStates.INITIAL
+        for variable in graph.variables.values():
+            source_op = variable.source_op
 
-            if source_config.state in {QuantizationStates.FP32}:
+            # input variables in network do not have a source, they are skipped as well.
+            source_config = source_configs.get(variable.name)
+            if source_config is None: continue
+            if source_config.state == FP32:
                 continue # if source config does not have a valid state, skip it.
 
+            # scheme of source config is compared with all its downstream configs, compute it only once.
+            platform, source_scheme = source_op.platform, source_config.scheme_signature
             for downstream_op, dest_idx in zip(variable.dest_ops, variable.dest_idx):
                 if downstream_op is None: continue # output variables in network, they do not have a destination
-                if not isinstance(downstream_op, QuantableOperation): continue
+                if id(downstream_op) not in quantable_ops: continue
 
                 input_config = downstream_op.config.input_quantization_config[dest_idx]
-                if source_op.platform == downstream_op.platform:
-                    if input_config.state == QuantizationStates.INITIAL and input_config.is_same_scheme(source_config):
+                if platform == downstream_op.platform:
+                    if input_config.state == INITIAL and input_config.scheme_signature == source_scheme:
                         input_config.dominated_by = source_config
 
 
@@ -134,7 +177,7 @@ class QuantizeFusionPass(QuantizationOptimizationPass):
 
     * activation_type(Set[str]):
             
-            A collection contains all activation types.
+            A collection contains all activation types, Relu and Clip are fused by default.
 
             The pattern will be recognized as [Computing Op -> Activation Op],
 
@@ -167,19 +210,22 @@ class QuantizeFusionPass(QuantizationOptimizationPass):
         collate_fn=collate_fn)
     """
     def __init__(self,
-                 activation_type: Set[str],
+                 activation_type: Set[str] = None,
                  fuse_activation: bool = True,
                  fuse_passive_op: bool = True,
                  fuse_relu_clip: bool = True) -> None:
         self.fuse_activation  = fuse_activation
         self.fuse_passive_op  = fuse_passive_op
         self.fuse_relu_clip   = fuse_relu_clip
-        self.activation_types = activation_type
+        # activation types are frozen, so that they can not be modified after this pass is created.
+        if activation_type is None: activation_type = _RELU_CLIP_TYPES
+        self.activation_types = frozenset(activation_type)
         super().__init__(name='PPQ Quantization Fusion Pass')
 
     def is_same_platform(self, operations: List[Operation]):
-        platforms = [operation.platform for operation in operations]
-        return all([platform == platforms[0] for platform in platforms])
+        if len(operations) == 0: return True
+        platform = operations[0].platform
+        return all(operation.platform == platform for operation in operations)
 
     @ empty_ppq_cache
     def optimize(
@@ -189,93 +235,58 @@ class QuantizeFusionPass(QuantizationOptimizationPass):
     ) -> None:
         processor = SearchableGraph(graph)
 
-        # fuse computing operations and its following activation.
+        # all patterns are matched within a single graph traversal.
+        # pattern matching only relies on graph structure, fusions below do not affect it.
+        # operation properties are resolved once here, pattern conditions only probe a set of id.
+        computing_ops = {id(op) for op in graph.operations.values() if op.is_computing_op}
+        act_ops       = {id(op) for op in graph.operations.values() if op.type in self.activation_types}
+        relu_clip_ops = {id(op) for op in graph.operations.values() if op.type in _RELU_CLIP_TYPES}
+        is_computing  = lambda x: id(x) in computing_ops
+
+        pattern_specs = {}
         if self.fuse_activation:
-            patterns = processor.pattern_matching(
-                patterns=[lambda x: x.is_computing_op, lambda x: x.type in self.activation_types],
-                edges=[[0, 1]], exclusive=True)
+            pattern_specs['Activation'] = (
+                [is_computing, lambda x: id(x) in act_ops], [[0, 1]])
+            if 'Swish' in self.activation_types:
+                pattern_specs['Swish'] = (
+                    [is_computing, 'Sigmoid', 'Mul'], [[0, 1], [1, 2], [0, 2]])
+            if 'Mish' in self.activation_types:
+                pattern_specs['Mish'] = (
+                    [is_computing, 'Softplus', 'Tanh', 'Mul'], [[0, 1], [1, 2], [2, 3], [0, 3]])
+        if self.fuse_relu_clip:
+            pattern_specs['ReluClip'] = (
+                [lambda x: True, lambda x: id(x) in relu_clip_ops], [[0, 1]])
+        matchings = dict(zip(pattern_specs.keys(), processor.multi_pattern_matching(
+            patterns=list(pattern_specs.values()), exclusive=True)))
+
+        # num of downstream and upstream operations, this pass never changes graph structure.
+        fanout = {op.name: sum(len(var.dest_ops) for var in op.outputs) for op in graph.operations.values()}
+        fanin  = {op.name: sum(var.source_op is not None for var in op.inputs) for op in graph.operations.values()}
 
-            for computing_op, act_op in patterns:
+        # fuse computing operations and its following activation.
+        if self.fuse_activation:
+            for computing_op, act_op in matchings['Activation']:
                 if not isinstance(act_op, QuantableOperation): continue
                 if not isinstance(computing_op, QuantableOperation): continue
-                
+
+                computing_config = computing_op.config.output_quantization_config[0]
                 if (computing_op.platform != act_op.platform and 
-                    computing_op.config.output_quantization_config[0].state != QuantizationStates.FP32):
+                    computing_config.state != QuantizationStates.FP32):
                     ppq_warning(f'Unexpected dispatching was found: '
                                 f'Op {computing_op.name} and {act_op.name} should be send to a same platform.')
                     continue
     
-                if (len(graph.get_downstream_operations(computing_op)) == 1 and 
-                    len(graph.get_upstream_operations(act_op)) == 1):
-                    computing_op.config.output_quantization_config[0].dominated_by = (
-                        act_op.config.output_quantization_config[0])
-                    act_op.config.input_quantization_config[0].dominated_by = (
-                        act_op.config.output_quantization_config[0])
+                if fanout[computing_op.name] == 1 and fanin[act_op.name] == 1:
+                    act_config = act_op.config
+                    master_config = act_config.output_quantization_config[0]
+                    computing_config.dominated_by = master_config
+                    act_config.input_quantization_config[0].dominated_by = master_config
 
             if 'Swish' in self.activation_types:
-                search_engine = SearchableGraph(graph)
-                patterns = search_engine.pattern_matching(
-                    patterns = [lambda x: x.is_computing_op, 'Sigmoid', 'Mul'],
-                    edges = [[0, 1], [1, 2], [0, 2]],
-                    exclusive = True)
-
-                for pattern in patterns:
-                    if any([not isinstance(op, QuantableOperation) for op in pattern]):
-                        ppq_warning(f'There is a pattern of swish activation in your network start from {pattern[0]}, '
-                                    'however part of your swish activation is not quantable, '
-                                    'so that graph fusion can not merge their quantization configuration.')
-                        continue
-                    if any([op.platform != pattern[0].platform for op in pattern]):
-                        ppq_warning(f'There is a pattern of swish activation in your network start from {pattern[0]}, '
-                                    'however part of your swish activation is not quantable, '
-                                    'so that graph fusion can not merge their quantization configuration.')
-                        continue
-                    computing, sigmoid, mul = pattern
-
-                    assert isinstance(computing, QuantableOperation)
-                    assert isinstance(sigmoid, QuantableOperation)
-                    assert isinstance(mul, QuantableOperation)
-
-                    master_config = mul.config.output_quantization_config[0]
-                    computing.config.output_quantization_config[0].dominated_by = master_config
-                    sigmoid.config.input_quantization_config[0].dominated_by    = master_config
-                    sigmoid.config.output_quantization_config[0].dominated_by   = master_config
-                    mul.config.input_quantization_config[0].dominated_by        = master_config
-                    mul.config.input_quantization_config[1].dominated_by        = master_config
+                _fuse_activation_patterns(matchings['Swish'], links=_SWISH_LINKS, activation='swish')
 
             if 'Mish' in self.activation_types:
-                search_engine = SearchableGraph(graph)
-                patterns = search_engine.pattern_matching(
-                    patterns = [lambda x: x.is_computing_op, 'Softplus', 'Tanh', 'Mul'],
-                    edges = [[0, 1], [1, 2], [2, 3], [0, 3]],
-                    exclusive = True)
-
-                for pattern in patterns:
-                    if any([not isinstance(op, QuantableOperation) for op in pattern]):
-                        ppq_warning(f'There is a pattern of mish activation in your network start from {pattern[0]}, '
-                                    'however part of your mish activation is not quantable, '
-                                    'so that graph fusion can not merge their quantization configuration.')
-                        continue
-                    if any([op.platform != pattern[0].platform for op in pattern]):
-                        ppq_warning(f'There is a pattern of mish activation in your network start from {pattern[0]}, '
-                                    'however part of your mish activation is not quantable, '
-                                    'so that graph fusion can not merge their quantization configuration.')
-                        continue
-                    computing, softplus, tanh, mul = pattern
-
-                    assert isinstance(computing, QuantableOperation)
-                    assert isinstance(softplus, QuantableOperation)
-                    assert isinstance(tanh, QuantableOperation)
-                    assert isinstance(mul, QuantableOperation)
-
-                    master_config = mul.config.output_quantization_config[0]
-                    computing.config.output_quantization_config[0].dominated_by = master_config
-                    tanh.config.input_quantization_config[0].dominated_by       = master_config
-                    tanh.config.output_quantization_config[0].dominated_by      = master_config
-                    softplus.config.input_quantization_config[0].dominated_by   = master_config
-                    softplus.config.output_quantization_config[0].dominated_by  = master_config
-                    mul.config.input_quantization_config[0].dominated_by        = master_config
-                    mul.config.input_quantization_config[1].dominated_by        = master_config
+                _fuse_activation_patterns(matchings['Mish'], links=_MISH_LINKS, activation='mish')
 
         if self.fuse_passive_op:
             # all passive operations should never changes quantization configuration of its input
@@ -286,24 +297,21 @@ class QuantizeFusionPass(QuantizationOptimizationPass):
                 if source_op is None: continue # beginning op, can not merge.
                 if (isinstance(op, QuantableOperation) and 
                     self.is_same_platform([op, source_op])):
-                    TQC = op.config.input_quantization_config[0]
-                    for output_cfg in op.config.output_quantization_config:
+                    op_config = op.config
+                    TQC = op_config.input_quantization_config[0]
+                    for output_cfg in op_config.output_quantization_config:
                         output_cfg.dominated_by = TQC
 
         if self.fuse_relu_clip:
-            patterns = processor.pattern_matching(
-                patterns=[lambda x: True, lambda x: x.type in {'Relu', 'Clip'}],
-                edges=[[0, 1]], exclusive=True)
-            for computing_op, act_op in patterns:
+            for computing_op, act_op in matchings['ReluClip']:
                 if not isinstance(act_op, QuantableOperation): continue
                 if not isinstance(computing_op, QuantableOperation): continue
 
-                if (len(graph.get_downstream_operations(computing_op)) == 1 and 
-                    len(graph.get_upstream_operations(act_op)) == 1):
-                    computing_op.config.output_quantization_config[0].dominated_by = (
-                        act_op.config.output_quantization_config[0])
-                    act_op.config.input_quantization_config[0].dominated_by = (
-                        act_op.config.output_quantization_config[0])
+                if fanout[computing_op.name] == 1 and fanin[act_op.name] == 1:
+                    act_config = act_op.config
+                    master_config = act_config.output_quantization_config[0]
+                    computing_op.config.output_quantization_config[0].dominated_by = master_config
+                    act_config.input_quantization_config[0].dominated_by = master_config
   
 
 class QuantAlignmentPass(QuantizationOptimizationPass):
@@ -450,32 +458,57 @@ class QuantAlignmentPass(QuantizationOptimizationPass):
 
         Any change to slave config will be rejected since then.
         """
-        global_min, global_max, master_config = 0, 0, op.config.input_quantization_config[0]
-        for config in op.config.input_quantization_config:
+        input_configs = op.config.input_quantization_config
+        global_min, global_max, master_config = 0, 0, input_configs[0]
+        configs = []
+        for config in input_configs:
             if config.state in {QuantizationStates.FP32, QuantizationStates.SOI}: continue
             if config.policy.has_property(QuantizationProperty.FLOATING): continue
-            
+
             assert config.policy.has_property(QuantizationProperty.PER_TENSOR), (
                 'Quant Alignment can only happen with per tensor quantization.')
-            local_min = config.scale * (config.quant_min - config.offset)
-            local_max = config.scale * (config.quant_max - config.offset)
-
-            assert isinstance(local_min, torch.Tensor)
-            assert isinstance(local_max, torch.Tensor)
-            global_max = max(global_max, local_max.item())
-            global_min = min(global_min, local_min.item())
-
-        # recompute scale and offset
-        scale, offset = minmax_to_scale_offset(
-            global_min, global_max, op.config.input_quantization_config[0])
-
-        device = master_config.scale.device
-        master_config._dominator = master_config
-        master_config.state  = QuantizationStates.PASSIVE
-        master_config.scale  = torch.tensor(scale, dtype=torch.float32, device=device)
-        master_config.offset = torch.tensor(offset, dtype=torch.float32, device=device)
-
-        for slave_config in op.config.input_quantization_config[1: ]:
+            assert isinstance(config.scale, torch.Tensor)
+            assert isinstance(config.offset, torch.Tensor)
+            configs.append(config)
+
+        # inputs are already aligned to master config(e.g. this op has been aligned before),
+        # their shared range is exactly what master config quantizes, skip recomputing scale and offset.
+        # recomputation would write new tensors to master config and slightly enlarge a symmetric scale again.
+        aligned = (
+            len(configs) > 0 and master_config.state == QuantizationStates.PASSIVE and
+            master_config.dominated_by is master_config and
+            all(config.scale is master_config.scale and config.offset is master_config.offset
+                for config in configs))
+
+        if not aligned:
+            # scales and offsets of all configs are fetched from device with a single transfer,
+            # range is then computed on host. quant_min and quant_max are python ints, build them on host
+            # so that they never go to device. minmax_to_scale_offset solves scale and offset with
+            # python float(double precision) on host as well.
+            if len(configs) > 0:
+                device    = configs[0].scale.device
+                scales    = torch.cat([config.scale.reshape(1).to(device) for config in configs])
+                offsets   = torch.cat([config.offset.reshape(1).to(device=device, dtype=scales.dtype) for config in configs])
+                scales, offsets = torch.stack([scales, offsets]).cpu()
+                quant_min = torch.tensor([config.quant_min for config in configs], dtype=offsets.dtype)
+                quant_max = torch.tensor([config.quant_max for config in configs], dtype=offsets.dtype)
+
+                local_min = (scales * (quant_min - offsets)).min().item()
+                local_max = (scales * (quant_max - offsets)).max().item()
+                global_min, global_max = min(global_min, local_min), max(global_max, local_max)
+
+            # recompute scale and offset
+            scale, offset = minmax_to_scale_offset(global_min, global_max, master_config)
+
+            # scale and offset are sent to device with one copy, they are views of a same tensor.
+            device = master_config.scale.device
+            scale, offset = torch.tensor([scale, offset], dtype=torch.float32).to(device).unbind()
+            master_config._dominator = master_config
+            master_config.state  = QuantizationStates.PASSIVE
+            master_config.scale  = scale
+            master_config.offset = offset
+
+        for slave_config in input_configs[1: ]:
             if config.state in {QuantizationStates.FP32, QuantizationStates.SOI}: continue
             if config.policy.has_property(QuantizationProperty.FLOATING): continue
             slave_config.master_by = master_config
@@ -495,42 +528,54 @@ class QuantAlignmentPass(QuantizationOptimizationPass):
                 slave_config.master_by = master_config
         return master_config
 
+    def alignment_dispatch(self) -> Dict[str, Callable]:
+        """Build alignment handler for each operation type, handler takes an
+        operation and returns its master config(or None)."""
+        def skip(op: QuantableOperation): return None
+
+        def choose(method: str) -> Callable:
+            if method == 'None': return skip
+            if method == 'Align to Large': return self.align_to_large
+            return self.align_to_output
+
+        def choose_io(method: str, error: str) -> Callable:
+            if method == 'None': return skip
+            if method == 'Align to Output': return self.align_to_output
+            if method == 'Align to Input':
+                def align_to_input(op: QuantableOperation):
+                    self.align_to_input(op) # do not set master_config
+                    return None
+                return align_to_input
+            if method == 'Align to Large':
+                def cannot_align_to_large(op: QuantableOperation):
+                    raise ValueError(error)
+                return cannot_align_to_large
+            return skip # unrecognized method takes no effect.
+
+        dispatch = {}
+        for op_type in TYPES_FOR_ALIGNMENT['Elementwise']:
+            dispatch[op_type] = choose(self.elementwise_alignment)
+        for op_type in TYPES_FOR_ALIGNMENT['Concat']:
+            dispatch.setdefault(op_type, choose(self.concat_alignment))
+        for op_type in TYPES_FOR_ALIGNMENT['Pooling']:
+            dispatch.setdefault(op_type, choose_io(
+                self.pooling_alignment, 'Alignment Method Error, Pooling Op can not align to lager input.'))
+        dispatch.setdefault('Resize', choose_io(
+            self.resize_alignment, 'Alignment Method Error, Resize Op can not align to lager.'))
+        return dispatch
+
     def optimize(self, graph: BaseGraph, **kwargs) -> None:
 
+        # handlers are resolved once for each operation type, instead of testing every type set for each op.
+        dispatch = self.alignment_dispatch()
         for operation in graph.operations.values():
             if not isinstance(operation, QuantableOperation): continue
 
             master_config = None
-            if operation.type in TYPES_FOR_ALIGNMENT['Elementwise']:
-                if self.elementwise_alignment == 'None': continue
-                if self.elementwise_alignment == 'Align to Large':
-                    master_config = self.align_to_large(operation)
-                else: master_config = self.align_to_output(operation)
+            handler = dispatch.get(operation.type)
+            if handler is not None:
+                master_config = handler(operation)
 
-            elif operation.type in TYPES_FOR_ALIGNMENT['Concat']:
-                if self.concat_alignment == 'None': continue
-                if self.concat_alignment == 'Align to Large':
-                    master_config = self.align_to_large(operation)
-                else: master_config = self.align_to_output(operation)
-
-            elif operation.type in TYPES_FOR_ALIGNMENT['Pooling']:
-                if self.pooling_alignment == 'None': continue
-                if self.pooling_alignment == 'Align to Input':
-                    self.align_to_input(operation) # do not set master_config
-                if self.pooling_alignment == 'Align to Output':
-                    master_config = self.align_to_output(operation)
-                if self.pooling_alignment == 'Align to Large':
-                    raise ValueError('Alignment Method Error, Pooling Op can not align to lager input.')
-
-            elif operation.type == 'Resize':
-                if self.resize_alignment == 'None': continue
-                if self.resize_alignment == 'Align to Output':
-                    master_config = self.align_to_output(operation)
-                if self.resize_alignment == 'Align to Input':
-                    self.align_to_input(operation) # do not set master_config
-                if self.resize_alignment == 'Align to Large':
-                    raise ValueError('Alignment Method Error, Resize Op can not align to lager.')
-                
             elif ALIGNMENT_MANUL_OVERRIDE in operation.extension_attrib:
                 method = operation.extension_attrib[ALIGNMENT_MANUL_OVERRIDE]
                 if self.concat_alignment == 'Align to Large':
@@ -557,35 +602,17 @@ class SwishFusionPass(QuantizationOptimizationPass):
 
     def optimize(self, graph: BaseGraph,
                  dataloader: Iterable, executor: BaseGraphExecutor, **kwargs) -> None:
+        # skip building the search engine when graph can not contain a swish pattern.
+        op_types = {op.type for op in graph.operations.values()}
+        if not {'Sigmoid', 'Mul'} <= op_types: return
+
         search_engine = SearchableGraph(graph)
-        patterns = search_engine.pattern_matching(
+        patterns = search_engine.pattern_matching_from(
+            anchors  = lambda x: x.is_computing_op,
             patterns = [lambda x: x.is_computing_op, 'Sigmoid', 'Mul'],
             edges = [[0, 1], [1, 2], [0, 2]],
             exclusive = True)
-
-        for pattern in patterns:
-            if any([not isinstance(op, QuantableOperation) for op in pattern]):
-                ppq_warning(f'There is a pattern of swish activation in your network start from {pattern[0]}, '
-                            'however part of your swish activation is not quantable, '
-                            'so that graph fusion can not merge their quantization configuration.')
-                continue
-            if any([op.platform != pattern[0].platform for op in pattern]):
-                ppq_warning(f'There is a pattern of swish activation in your network start from {pattern[0]}, '
-                            'however part of your swish activation is not quantable, '
-                            'so that graph fusion can not merge their quantization configuration.')
-                continue
-            computing, sigmoid, mul = pattern
-
-            assert isinstance(computing, QuantableOperation)
-            assert isinstance(sigmoid, QuantableOperation)
-            assert isinstance(mul, QuantableOperation)
-
-            master_config = mul.config.output_quantization_config[0]
-            computing.config.output_quantization_config[0].dominated_by = master_config
-            sigmoid.config.input_quantization_config[0].dominated_by    = master_config
-            sigmoid.config.output_quantization_config[0].dominated_by   = master_config
-            mul.config.input_quantization_config[0].dominated_by        = master_config
-            mul.config.input_quantization_config[1].dominated_by        = master_config
+        _fuse_activation_patterns(patterns, links=_SWISH_LINKS, activation='swish')
 
 
 class MishFusionPass(QuantizationOptimizationPass):
@@ -593,38 +620,17 @@ class MishFusionPass(QuantizationOptimizationPass):
         super().__init__('Mish Fusion')
 
     def optimize(self, graph: BaseGraph, **kwargs) -> None:
+        # skip building the search engine when graph can not contain a mish pattern.
+        op_types = {op.type for op in graph.operations.values()}
+        if not {'Softplus', 'Tanh', 'Mul'} <= op_types: return
+
         search_engine = SearchableGraph(graph)
-        patterns = search_engine.pattern_matching(
+        patterns = search_engine.pattern_matching_from(
+            anchors  = lambda x: x.is_computing_op,
             patterns = [lambda x: x.is_computing_op, 'Softplus', 'Tanh', 'Mul'],
             edges = [[0, 1], [1, 2], [2, 3], [0, 3]],
             exclusive = True)
-
-        for pattern in patterns:
-            if any([not isinstance(op, QuantableOperation) for op in pattern]):
-                ppq_warning(f'There is a pattern of mish activation in your network start from {pattern[0]}, '
-                            'however part of your mish activation is not quantable, '
-                            'so that graph fusion can not merge their quantization configuration.')
-                continue
-            if any([op.platform != pattern[0].platform for op in pattern]):
-                ppq_warning(f'There is a pattern of mish activation in your network start from {pattern[0]}, '
-                            'however part of your mish activation is not quantable, '
-                            'so that graph fusion can not merge their quantization configuration.')
-                continue
-            computing, softplus, tanh, mul = pattern
-
-            assert isinstance(computing, QuantableOperation)
-            assert isinstance(softplus, QuantableOperation)
-            assert isinstance(tanh, QuantableOperation)
-            assert isinstance(mul, QuantableOperation)
-
-            master_config = mul.config.output_quantization_config[0]
-            computing.config.output_quantization_config[0].dominated_by = master_config
-            tanh.config.input_quantization_config[0].dominated_by       = master_config
-            tanh.config.output_quantization_config[0].dominated_by      = master_config
-            softplus.config.input_quantization_config[0].dominated_by   = master_config
-            softplus.config.output_quantization_config[0].dominated_by  = master_config
-            mul.config.input_quantization_config[0].dominated_by        = master_config
-            mul.config.input_quantization_config[1].dominated_by        = master_config
+        _fuse_activation_patterns(patterns, links=_MISH_LINKS, activation='mish')
 
 
 class NxpInputRoundingRefinePass(QuantizationOptimizationPass):
@@ -4,6 +4,10 @@ from typing import Any, Callable
 
 
 class BaseQuantFunction(Callable, metaclass=ABCMeta):
+    """Interface of class based quant functions, quant functions of ppq are
+    plain functions(PPQuantFunction, PPQLinearQuantFunction, ...),
+    which satisfy this interface without inheriting from it."""
+
     def __init__(self) -> None:
         pass
 
@@ -334,7 +334,8 @@ class BaseQuantizer(metaclass = ABCMeta):
                 steps              = blockwise_reconstruction_setting.steps,
                 gamma              = blockwise_reconstruction_setting.gamma,
                 is_scale_trainable = blockwise_reconstruction_setting.is_scale_trainable,
-                block_size         = blockwise_reconstruction_setting.block_size
+                block_size         = blockwise_reconstruction_setting.block_size,
+                using_bf16         = blockwise_reconstruction_setting.using_bf16
             ))
             # requant passive parameters
             list_of_passes.append(PassiveParameterQuantizePass())
@@ -3,12 +3,22 @@ from ppq.core.defs import ppq_legacy
 
 logger = NaiveLogger.get_logger('PPQ')
 
+def _check_spatial_dims(input_shape, *attributes):
+    # pads are computed with zip, which silently stops at the shortest attribute.
+    for attribute in attributes:
+        if len(attribute) < len(input_shape):
+            raise IndexError(f'Attribute {attribute} has less dimensions than input shape {input_shape}.')
+
+
 # attribute checker and preprocess
 def process_attribute(attr, input_shape, kernel_shape=None, op_type=None):
     # ASSUME input is 2D
     # assert len(input_shape) == 2
     # Get default attr value
     auto_pad = attr.get('auto_pad', 'NOTSET')
+    # explicit pads(or no padding at all), nothing to be computed.
+    if auto_pad == 'NOTSET' and not (op_type == 'ConvTranspose' and 'output_shape' in attr): return
+
     strides = attr.get('strides', [1, 1])
     dilations = attr.get('dilations', [1, 1])
     kernels = attr.get('kernel_shape', kernel_shape)
@@ -17,8 +27,9 @@ def process_attribute(attr, input_shape, kernel_shape=None, op_type=None):
     if op_type == 'ConvTranspose' and 'output_shape' in attr:
         output_shape = attr['output_shape']
         out_pad = [0, 1] if output_shape % 2 != 0 else [0, 0]
-        pad_needed = [(input_shape[i] - 1) * strides[i] + dilations[i] * (kernels[i] - 1) + 1 + out_pad[i] -
-                      output_shape[i] for i in range(len(input_shape))]
+        _check_spatial_dims(input_shape, strides, dilations, kernels, out_pad, output_shape)
+        pad_needed = [(i - 1) * s + d * (k - 1) + 1 + p - o for i, s, d, k, p, o in
+                      zip(input_shape, strides, dilations, kernels, out_pad, output_shape)]
 
     if auto_pad != 'NOTSET':
         if 'pads' in attr:
@@ -30,23 +41,24 @@ def process_attribute(attr, input_shape, kernel_shape=None, op_type=None):
             if op_type == 'ConvTranspose':
                 # `output_padding` is only used to find output shape, but does not actually add zero-padding to output
                 out_pad = attr.get('output_padding', [0, 0])
-                output_shape = [input_shape[i] * strides[i] for i in range(len(input_shape))]
-                pad_needed = [(input_shape[i] - 1) * strides[i] + dilations[i] * (kernels[i] - 1) + 1 + out_pad[i] -
-                              output_shape[i] for i in range(len(input_shape))]
+                # output shape of each dimension is i * s, which cancels out with (i - 1) * s,
+                # so that no output shape list needs to be built.
+                _check_spatial_dims(input_shape, strides, dilations, kernels, out_pad)
+                pad_needed = [d * (k - 1) + 1 + p - s for s, d, k, p in
+                              zip(strides, dilations, kernels, out_pad)][: len(input_shape)]
             else:
-                output_shape = [(input_shape[i] + strides[i] - 1) // strides[i] for i in range(len(input_shape))]
-                pad_needed = [(output_shape[i] - 1) * strides[i] + dilations[i] * (kernels[i] - 1) + 1 - input_shape[i]
-                              for i in range(len(input_shape))]
+                # output shape of each dimension is ceil(i / s), computed inline within the same pass.
+                _check_spatial_dims(input_shape, strides, dilations, kernels)
+                pad_needed = [((i + s - 1) // s - 1) * s + d * (k - 1) + 1 - i for i, s, d, k in
+                              zip(input_shape, strides, dilations, kernels)]
         else:
             raise ValueError(f'Invalid auto_pad value {auto_pad}')
 
     if pad_needed is not None:
-        pads = []
-        for item in pad_needed:
-            pads.append((item if auto_pad == 'SAME_UPPER' else item + 1) // 2)
+        begins = [(item if auto_pad == 'SAME_UPPER' else item + 1) // 2 for item in pad_needed]
+        ends   = [item - begin for item, begin in zip(pad_needed, begins)]
         # onnx pads format should be as follow [x1_begin, x2_begin...x1_end, x2_end,...]
-        pads = pads + [pad_needed[i] - p for i, p in enumerate(pads)]
-        attr['pads'] = pads
+        attr['pads'] = begins + ends
         # onnx pads attribute cannot be used simultaneously with auto_pad attribute
         attr.pop('auto_pad')
 
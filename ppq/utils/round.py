@@ -1,11 +1,35 @@
-from decimal import ROUND_HALF_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, Decimal
 from math import ceil, floor, log2
 from typing import Union
 
 import torch
-from ppq.core import RoundingPolicy
+from ppq.core import RoundingPolicy, ppq_torch_compile
 from torch.autograd import Function
 
+@ ppq_torch_compile
+def round_half_towards_zero(value: torch.Tensor) -> torch.Tensor:
+    """sign, abs, sub, ceil and mul are fused into a single elementwise kernel
+    when PPQ_CONFIG.USING_TORCH_COMPILE = True."""
+    return torch.sign(value) * torch.ceil(value.abs() - 0.5)
+
+
+@ ppq_torch_compile
+def round_half_far_from_zero(value: torch.Tensor) -> torch.Tensor:
+    return torch.sign(value) * torch.floor(value.abs() + 0.5)
+
+
+# rounding function of each policy, they are looked up once for each call instead of comparing policies one by one.
+# default rounding policy of torch is ROUND_TO_NEAR_EVEN
+# try this: print(torch.Tensor([1.5, 2.5, 3.5, 4.5]).round())
+# However it may generate unexpected results due to version difference.
+TENSOR_ROUNDING_FUNCTIONS = {
+    RoundingPolicy.ROUND_HALF_EVEN:          torch.round,
+    RoundingPolicy.ROUND_UP:                 torch.ceil,
+    RoundingPolicy.ROUND_HALF_TOWARDS_ZERO:  round_half_towards_zero,
+    RoundingPolicy.ROUND_HALF_FAR_FORM_ZERO: round_half_far_from_zero,
+    RoundingPolicy.ROUND_HALF_DOWN:          lambda value: torch.ceil(value - 0.5),
+    RoundingPolicy.ROUND_HALF_UP:            lambda value: torch.floor(value + 0.5),
+}
+
 class PPQTensorRoundImpl(Function):
     @ staticmethod
     def forward(ctx, value: torch.Tensor, 
@@ -24,25 +48,11 @@ class PPQTensorRoundImpl(Function):
             torch.Tensor: [description]
         """
         assert isinstance(value, torch.Tensor), 'tensor round only takes effect on torch tensor.'
-        if policy == RoundingPolicy.ROUND_HALF_EVEN:
-            # default rounding policy of torch is ROUND_TO_NEAR_EVEN
-            # try this: print(torch.Tensor([1.5, 2.5, 3.5, 4.5]).round())
-            # However it may generate unexpected results due to version difference.
-            return value.round()
-        elif policy == RoundingPolicy.ROUND_UP:
-            return value.ceil()
-        elif policy == RoundingPolicy.ROUND_HALF_TOWARDS_ZERO:
-            return torch.sign(value) * torch.ceil(value.abs() - 0.5)
-        elif policy == RoundingPolicy.ROUND_HALF_FAR_FORM_ZERO:
-            return torch.sign(value) * torch.floor(value.abs() + 0.5)
-        elif policy == RoundingPolicy.ROUND_HALF_DOWN:
-            return torch.ceil(value - 0.5)
-        elif policy == RoundingPolicy.ROUND_HALF_UP:
-            return torch.floor(value + 0.5)
-        elif policy == RoundingPolicy.ROUND_TO_NEAR_INT:
+        rounding_fn = TENSOR_ROUNDING_FUNCTIONS.get(policy)
+        if rounding_fn is not None: return rounding_fn(value)
+        if policy == RoundingPolicy.ROUND_TO_NEAR_INT:
             raise NotImplementedError(f'Torch Tensor can not use this rounding policy({policy}) try ROUND_HALF_EVEN instead.')
-        else:
-            raise ValueError('Unexpected rounding policy found.')
+        raise ValueError('Unexpected rounding policy found.')
 
     @ staticmethod
     def backward(ctx, dy: torch.Tensor):
@@ -74,14 +84,20 @@ def ppq_numerical_round(value: float,
         int: [description]
     """
     assert isinstance(value, float), 'numerical round only takes effect on float number.'
+    # float is rounded with exact arithmetic instead of decimal.Decimal:
+    #   builtin round rounds half to even on the exact binary value of float,
+    #   value - round(value) is always exact(Sterbenz lemma), so ties are detected without error.
+    # ROUND_HALF_UP sends ties towards +inf, ROUND_HALF_DOWN sends ties towards -inf,
+    #   same as quantizing Decimal(value) with ROUND_HALF_UP / ROUND_HALF_DOWN on the positive side
+    #   and ROUND_HALF_DOWN / ROUND_HALF_UP on the negative side.
     if policy == RoundingPolicy.ROUND_HALF_EVEN:
-        return int(Decimal(value).quantize(exp=Decimal(1), rounding=ROUND_HALF_EVEN))
+        return round(value)
     elif policy == RoundingPolicy.ROUND_HALF_UP:
-        if value > 0: return int(Decimal(value).quantize(exp=Decimal(1), rounding=ROUND_HALF_UP))
-        else: return int(Decimal(value).quantize(exp=Decimal(1), rounding=ROUND_HALF_DOWN))
+        integer = round(value)
+        return integer + 1 if value - integer == 0.5 else integer
     elif policy == RoundingPolicy.ROUND_HALF_DOWN:
-        if value > 0: return int(Decimal(value).quantize(exp=Decimal(1), rounding=ROUND_HALF_DOWN))
-        else: return int(Decimal(value).quantize(exp=Decimal(1), rounding=ROUND_HALF_UP))
+        integer = round(value)
+        return integer - 1 if value - integer == -0.5 else integer
     elif policy == RoundingPolicy.ROUND_HALF_TOWARDS_ZERO:
         return ppq_numerical_round(value, RoundingPolicy.ROUND_HALF_DOWN)
     elif policy == RoundingPolicy.ROUND_HALF_FAR_FORM_ZERO:
@@ -133,3 +149,24 @@ def ppq_round_to_power_of_2(value: Union[float, int],
     assert isinstance(value, float) or isinstance(value, int), \
         'power-of-2 round only takes effect on float or int.'
     return sign * float(pow(2, ppq_numerical_round(log2(sign * value), policy=policy)))
+
+def ppq_tensor_round_to_power_of_2(value: torch.Tensor,
+    policy: RoundingPolicy=RoundingPolicy.ROUND_UP) -> torch.Tensor:
+    """
+    Round each element of a given tensor under Power-of-2 restrction,
+        tensor version of ppq_round_to_power_of_2.
+
+    Exponents are computed in float64 like ppq_round_to_power_of_2, zero elements stay zero.
+
+    Args:
+        value (torch.Tensor): values to be rounded, for example per-channel scales.
+        policy (RoundingPolicy, optional): _description_. Defaults to RoundingPolicy.ROUND_UP.
+
+    Returns:
+        torch.Tensor: rounded values, with the same dtype as value.
+    """
+    assert isinstance(value, torch.Tensor), 'tensor power-of-2 round only takes effect on torch tensor.'
+    magnitude = value.double().abs()
+    exponent  = ppq_tensor_round(torch.log2(magnitude), policy=policy)
+    rounded   = torch.sign(value.double()) * torch.pow(2.0, exponent)
+    return torch.where(magnitude == 0, torch.zeros_like(rounded), rounded).to(value.dtype)
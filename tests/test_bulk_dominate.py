@@ -0,0 +1,54 @@
+import random
+
+from ppq.core import (QuantizationPolicy, QuantizationProperty,
+                      TensorQuantizationConfig)
+
+# TensorQuantizationConfig.bulk_dominate should work exactly as
+# setting slave.dominated_by = master one by one.
+POLICY = QuantizationPolicy(
+    QuantizationProperty.SYMMETRICAL +
+    QuantizationProperty.LINEAR +
+    QuantizationProperty.PER_TENSOR)
+
+
+def create_configs(num_of_configs: int):
+    return [TensorQuantizationConfig(policy=POLICY) for _ in range(num_of_configs)]
+
+
+def dominate(config: TensorQuantizationConfig, master: TensorQuantizationConfig):
+    try: config.dominated_by = master
+    except ValueError: pass
+
+
+def snapshot(configs):
+    position = {id(config): idx for idx, config in enumerate(configs)}
+    return [(position[id(config.dominated_by)], config.state) for config in configs]
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    for _ in range(1000):
+        num_of_configs = random.randint(2, 10)
+        sequential, bulk = create_configs(num_of_configs), create_configs(num_of_configs)
+
+        # build a same union-find forest for both config lists.
+        for _ in range(random.randint(0, num_of_configs)):
+            a, b = random.sample(range(num_of_configs), 2)
+            dominate(sequential[a], sequential[b])
+            dominate(bulk[a], bulk[b])
+        assert snapshot(sequential) == snapshot(bulk)
+
+        # slaves may repeat, be grouped already, or be the master itself(which raises).
+        master = random.randrange(num_of_configs)
+        slaves = [random.randrange(num_of_configs) for _ in range(random.randint(1, num_of_configs))]
+
+        sequential_error = bulk_error = None
+        try:
+            for slave in slaves: sequential[slave].dominated_by = sequential[master]
+        except ValueError as e: sequential_error = str(e)
+        try:
+            TensorQuantizationConfig.bulk_dominate(bulk[master], [bulk[slave] for slave in slaves])
+        except ValueError as e: bulk_error = str(e)
+
+        assert sequential_error == bulk_error
+        assert snapshot(sequential) == snapshot(bulk)
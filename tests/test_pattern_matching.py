@@ -0,0 +1,104 @@
+import random
+
+from ppq import *
+from ppq.IR.search import SearchableGraph
+
+OP_TYPES = ['Conv', 'Gemm', 'Relu', 'Sigmoid', 'Mul', 'Softplus', 'Tanh', 'Add', 'Clip']
+
+# (node patterns, edges), same as patterns used by QuantizeFusionPass.
+PATTERNS = [
+    ([lambda x: x.is_computing_op, 'Sigmoid', 'Mul'], [[0, 1], [1, 2], [0, 2]]),
+    ([lambda x: x.is_computing_op, 'Softplus', 'Tanh', 'Mul'], [[0, 1], [1, 2], [2, 3], [0, 3]]),
+    ([lambda x: x.is_computing_op, lambda x: x.type in {'Relu', 'Clip'}], [[0, 1]]),
+    ([lambda x: True, lambda x: True, lambda x: True], [[0, 1], [1, 2]]),
+]
+
+
+def random_graph(num_of_ops: int) -> BaseGraph:
+    graph, operations = BaseGraph(name='Graph', built_from=NetworkFramework.ONNX), []
+
+    def add_operation(op_type: str, upstream_ops) -> Operation:
+        operation = Operation(name=f'op{len(operations)}', op_type=op_type, attributes={})
+        graph.append_operation(operation=operation)
+        for upstream_op in upstream_ops:
+            graph.create_link_with_op(variable=graph.create_variable(), A=upstream_op, B=operation)
+        operations.append(operation)
+        return operation
+
+    while len(operations) < num_of_ops:
+        computing_ops = [op for op in operations if op.is_computing_op]
+        motif = random.random()
+        if motif < 0.15 and computing_ops: # swish: x * sigmoid(x)
+            x = random.choice(computing_ops)
+            add_operation('Mul', [x, add_operation('Sigmoid', [x])])
+        elif motif < 0.25 and computing_ops: # mish: x * tanh(softplus(x))
+            x = random.choice(computing_ops)
+            add_operation('Mul', [x, add_operation('Tanh', [add_operation('Softplus', [x])])])
+        else: add_operation(random.choice(OP_TYPES), random.sample(operations, k=min(len(operations), random.randint(0, 2))))
+    return graph
+
+
+def names(matchings):
+    return [[operation.name for operation in matching] for matching in matchings]
+
+
+def test_hand_made_graph():
+    # swish and relu patterns in a hand-made graph.
+    graph = BaseGraph(name='Graph', built_from=NetworkFramework.ONNX)
+    graph.append_operation(operation=Operation(name='conv1', op_type='Conv', attributes={}))
+    graph.append_operation(operation=Operation(name='sigmoid', op_type='Sigmoid', attributes={}))
+    graph.append_operation(operation=Operation(name='mul', op_type='Mul', attributes={}))
+    graph.append_operation(operation=Operation(name='conv2', op_type='Conv', attributes={}))
+    graph.append_operation(operation=Operation(name='relu', op_type='Relu', attributes={}))
+    for A, B in [('conv1', 'sigmoid'), ('sigmoid', 'mul'), ('conv1', 'mul'), ('mul', 'conv2'), ('conv2', 'relu')]:
+        graph.create_link_with_op(variable=graph.create_variable(), A=graph.operations[A], B=graph.operations[B])
+
+    processor = SearchableGraph(graph)
+    swish, mish, relu, _ = processor.multi_pattern_matching(patterns=PATTERNS, exclusive=True)
+    assert names(swish) == [['conv1', 'sigmoid', 'mul']]
+    assert names(mish) == []
+    assert names(relu) == [['conv2', 'relu']]
+
+
+def test_multi_pattern_matching():
+    # matching several patterns at once should give the same result as matching them one by one.
+    random.seed(0)
+    for _ in range(50):
+        graph = random_graph(num_of_ops=random.randint(5, 60))
+        processor = SearchableGraph(graph)
+        for exclusive in (True, False):
+            matchings = processor.multi_pattern_matching(patterns=PATTERNS, exclusive=exclusive)
+            assert len(matchings) == len(PATTERNS)
+            for (node_patterns, edges), matching in zip(PATTERNS, matchings):
+                expected = processor.pattern_matching(patterns=node_patterns, edges=edges, exclusive=exclusive)
+                assert names(matching) == names(expected)
+
+
+def test_anchored_matching():
+    # anchored matching should give the same result as matching the whole graph,
+    # restricted to matchings whose root is one of the anchors.
+    random.seed(1)
+    for _ in range(50):
+        graph = random_graph(num_of_ops=random.randint(5, 60))
+        processor = SearchableGraph(graph)
+        anchors = random.sample(list(graph.operations.values()), k=random.randint(0, len(graph.operations)))
+        anchor_names = {operation.name for operation in anchors}
+        for exclusive in (True, False):
+            for node_patterns, edges in PATTERNS:
+                expected = processor.pattern_matching(patterns=node_patterns, edges=edges, exclusive=exclusive)
+
+                # anchors given by predicate, same as the root pattern.
+                matching = processor.pattern_matching_from(
+                    anchors=lambda x: x.is_computing_op, patterns=node_patterns, edges=edges, exclusive=exclusive)
+                assert names(matching) == [m for m in names(expected) if graph.operations[m[0]].is_computing_op]
+
+                # anchors given by a collection of operations.
+                matching = processor.pattern_matching_from(
+                    anchors=anchors, patterns=node_patterns, edges=edges, exclusive=exclusive)
+                assert names(matching) == [m for m in names(expected) if m[0] in anchor_names]
+
+
+if __name__ == '__main__':
+    test_hand_made_graph()
+    test_multi_pattern_matching()
+    test_anchored_matching()
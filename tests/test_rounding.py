@@ -1,5 +1,7 @@
+import torch
 from ppq.core.quant import RoundingPolicy
-from ppq.utils.round import ppq_numerical_round, ppq_round_to_power_of_2
+from ppq.utils.round import (ppq_numerical_round, ppq_round_to_power_of_2,
+                             ppq_tensor_round_to_power_of_2)
 
 if __name__ == '__main__':
     assert ppq_numerical_round(1.5, policy=RoundingPolicy.ROUND_HALF_EVEN) == 2
@@ -35,3 +37,18 @@ if __name__ == '__main__':
     assert ppq_round_to_power_of_2(3.2) == 4
     assert ppq_round_to_power_of_2(0.26) == 0.5
     assert ppq_round_to_power_of_2(0.24) == 0.25
+
+    # tensor power-of-2 round should agree with ppq_round_to_power_of_2 element by element.
+    torch.manual_seed(0)
+    values = torch.cat([
+        torch.randn(1000) * torch.pow(10, torch.randint(-6, 6, size=[1000]).float()),
+        torch.tensor([0.0, 1.0, -1.0, 0.5, -0.25, 3.0, 1024.0, 1.5, -6.0])])
+    for policy in [RoundingPolicy.ROUND_UP, RoundingPolicy.ROUND_HALF_EVEN,
+                   RoundingPolicy.ROUND_HALF_UP, RoundingPolicy.ROUND_HALF_DOWN,
+                   RoundingPolicy.ROUND_HALF_TOWARDS_ZERO, RoundingPolicy.ROUND_HALF_FAR_FORM_ZERO]:
+        for dtype in [torch.float32, torch.float64]:
+            tensor   = values.to(dtype)
+            rounded  = ppq_tensor_round_to_power_of_2(tensor, policy=policy)
+            expected = torch.tensor([ppq_round_to_power_of_2(v, policy=policy) for v in tensor.tolist()], dtype=dtype)
+            assert rounded.dtype == dtype
+            assert torch.equal(rounded, expected), f'power-of-2 round mismatch with policy {policy}.'